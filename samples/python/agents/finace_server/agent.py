@@ -1,6 +1,70 @@
-import json
+import asyncio
 import datetime
-from typing import Any, AsyncIterable, Dict, Optional, List
+import sys
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, AsyncIterable, Dict, List, Optional
+
+import orjson
+
+# 超过这个行数的审核结果在线程池中序列化，避免阻塞事件循环；
+# 小结果直接内联序列化，省去线程切换开销
+_OFFLOAD_THRESHOLD = 500
+
+
+@dataclass(slots=True)
+class ExpenseResult:
+    """单条报销项目的审核结果，仅在最终构造JSON响应时转回dict。"""
+
+    index: int  # 在输入expenses中的行号
+    compliant: bool
+    reasons: List[str]
+
+
+def _compliance_kernel(
+    categories: List[str],
+    amounts: List[float],
+    dates: List[str],
+    invoices: List[bool],
+    limits: Dict[str, float],
+    need_invoice: Dict[str, bool],
+    meal_daily_limit: int,
+) -> List[ExpenseResult]:
+    """对预先抽取好的各列执行合规检查，返回每行的 ExpenseResult。
+
+    只处理已归一化的纯数据列，不接触原始 dict，方便单独测试和优化。
+    """
+    results = []
+
+    # 按日期计数处理餐饮费的每日限制（此前按日期累计的金额从未被使用）
+    daily_meals = Counter()
+
+    for index, (category, amount, date, has_invoice) in enumerate(
+        zip(categories, amounts, dates, invoices)
+    ):
+        is_compliant = True
+        reasons = []
+
+        # 检查金额是否超过限额
+        if amount > limits[category]:
+            is_compliant = False
+            reasons.append(f"超出{category}最高限额{limits[category]}元")
+
+        # 检查是否有发票
+        if need_invoice[category] and not has_invoice:
+            is_compliant = False
+            reasons.append(f"{category}需要提供发票")
+
+        # 特殊处理餐饮费的每日次数限制
+        if category == "餐饮费":
+            daily_meals[date] += 1
+            if daily_meals[date] > meal_daily_limit:
+                is_compliant = False
+                reasons.append(f"超出餐饮费每日{meal_daily_limit}次限制")
+
+        results.append(ExpenseResult(index, is_compliant, reasons))
+
+    return results
 
 
 class FinanceAgent:
@@ -9,33 +73,23 @@ class FinanceAgent:
     SUPPORTED_CONTENT_TYPES = ["text", "data"]
 
     def __init__(self):
-        # 定义报销标准和规则
-        self.reimbursement_rules = {
-            "交通费": {
-                "最高限额": 300.0,
-                "需要发票": True,
-                "备注": "火车限二等座，飞机限经济舱"
-            },
-            "餐饮费": {
-                "最高限额": 100.0,
-                "每日次数限制": 3,
-                "需要发票": True
-            },
-            "住宿费": {
-                "最高限额": 500.0,
-                "需要发票": True,
-                "备注": "限标准间"
-            },
-            "办公用品": {
-                "最高限额": 200.0,
-                "需要发票": True
-            },
-            "其他": {
-                "最高限额": 100.0,
-                "需要发票": True,
-                "需要额外审批": True
-            }
+        # 定义报销标准和规则，按字段拆成并行的扁平表（SoA布局），
+        # 每次规则访问只需一次dict查找，不再经过嵌套的每类别dict。
+        # 键统一 intern，配合抽取时对类别字符串的 intern，
+        # 查找可以走缓存哈希+指针比较的快路径。
+        # 备注：交通费火车限二等座、飞机限经济舱；住宿费限标准间；"其他"类需要额外审批
+        self._limit = {
+            sys.intern(category): limit
+            for category, limit in {
+                "交通费": 300.0,
+                "餐饮费": 100.0,
+                "住宿费": 500.0,
+                "办公用品": 200.0,
+                "其他": 100.0,
+            }.items()
         }
+        self._need_invoice = {category: True for category in self._limit}
+        self._meal_daily_limit = 3  # 餐饮费每日次数限制
         self.sessions = {}  # 用于存储会话状态
     
     def _check_compliance(self, expenses: List[Dict]) -> Dict[str, Any]:
@@ -48,59 +102,56 @@ class FinanceAgent:
         Returns:
             包含审核结果的字典
         """
-        total_amount = 0.0
-        compliant_expenses = []
-        non_compliant_expenses = []
-        
-        # 按日期分组处理餐饮费的每日限制
-        daily_meals = {}
-        
+        # 先把各字段按列抽取出来（SoA布局），未知类别统一归一化为"其他"，
+        # 主循环中就不再需要逐行的 dict 查找和类别检查。
+        # dict.get 的默认值是立即求值的，缺省日期只在循环外计算一次
+        today = datetime.datetime.now().strftime("%Y-%m-%d")
+        categories = []
+        amounts = []
+        dates = []
+        invoices = []
         for expense in expenses:
             category = expense.get("类别", "其他")
-            amount = float(expense.get("金额", 0))
-            date = expense.get("日期", datetime.datetime.now().strftime("%Y-%m-%d"))
-            has_invoice = expense.get("是否有发票", False)
-            
-            # 检查该类别是否在规则中
-            if category not in self.reimbursement_rules:
+            if category not in self._limit:
                 category = "其他"
-                
-            rule = self.reimbursement_rules[category]
-            is_compliant = True
-            reasons = []
-            
-            # 检查金额是否超过限额
-            if amount > rule["最高限额"]:
-                is_compliant = False
-                reasons.append(f"超出{category}最高限额{rule['最高限额']}元")
-            
-            # 检查是否有发票
-            if rule["需要发票"] and not has_invoice:
-                is_compliant = False
-                reasons.append(f"{category}需要提供发票")
-            
-            # 特殊处理餐饮费的每日次数限制
-            if category == "餐饮费":
-                if date not in daily_meals:
-                    daily_meals[date] = {"count": 0, "total": 0.0}
-                
-                daily_meals[date]["count"] += 1
-                daily_meals[date]["total"] += amount
-                
-                if daily_meals[date]["count"] > rule["每日次数限制"]:
-                    is_compliant = False
-                    reasons.append(f"超出餐饮费每日{rule['每日次数限制']}次限制")
-            
-            # 记录结果
-            expense_result = expense.copy()
-            expense_result["合规"] = is_compliant
-            
-            if is_compliant:
-                compliant_expenses.append(expense_result)
-                total_amount += amount
             else:
-                expense_result["原因"] = reasons
-                non_compliant_expenses.append(expense_result)
+                # 换成 intern 过的同值字符串，后续内核中的规则查找
+                # 直接命中缓存哈希和指针相等的快路径
+                category = sys.intern(category)
+            categories.append(category)
+            amounts.append(float(expense.get("金额", 0)))
+            dates.append(expense.get("日期") or today)
+            invoices.append(expense.get("是否有发票", False))
+
+        results = _compliance_kernel(
+            categories,
+            amounts,
+            dates,
+            invoices,
+            self._limit,
+            self._need_invoice,
+            self._meal_daily_limit,
+        )
+
+        # 中间结果保存为轻量的 ExpenseResult 记录，
+        # 只在这里的JSON边界上一次性构造输出dict
+        total_amount = 0.0
+        compliant_results = []
+        non_compliant_results = []
+        for result in results:
+            if result.compliant:
+                compliant_results.append(result)
+                total_amount += amounts[result.index]
+            else:
+                non_compliant_results.append(result)
+
+        compliant_expenses = [
+            {**expenses[result.index], "合规": True} for result in compliant_results
+        ]
+        non_compliant_expenses = [
+            {**expenses[result.index], "合规": False, "原因": result.reasons}
+            for result in non_compliant_results
+        ]
         
         return {
             "合规报销": compliant_expenses,
@@ -124,15 +175,16 @@ class FinanceAgent:
         """
         try:
             # 尝试将查询解析为JSON数据
-            data = json.loads(query) if isinstance(query, str) else query
-            
+            data = orjson.loads(query) if isinstance(query, str) else query
+
             if isinstance(data, dict) and "expenses" in data:
                 # 处理报销数据
                 result = self._check_compliance(data["expenses"])
-                return json.dumps(result, ensure_ascii=False, indent=2)
+                # orjson 直接输出UTF-8字节，非ASCII字符原样保留
+                return orjson.dumps(result, option=orjson.OPT_INDENT_2).decode()
             else:
                 return "MISSING_INFO: 请提供包含expenses字段的报销数据，格式为JSON"
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             # 如果不是JSON，则尝试理解文本查询
             return "MISSING_INFO: 请提供有效的JSON格式报销数据"
         except Exception as e:
@@ -159,8 +211,8 @@ class FinanceAgent:
             # 尝试将查询解析为JSON数据
             if isinstance(query, str):
                 try:
-                    data = json.loads(query)
-                except json.JSONDecodeError:
+                    data = orjson.loads(query)
+                except orjson.JSONDecodeError:
                     yield {
                         "is_task_complete": True,
                         "content": "MISSING_INFO: 请提供有效的JSON格式报销数据"
@@ -172,13 +224,19 @@ class FinanceAgent:
             if isinstance(data, dict) and "expenses" in data:
                 # 处理报销数据
                 result = self._check_compliance(data["expenses"])
-                
+
+                # 大批量结果的序列化放到线程池，保持事件循环可响应
+                if result["报销项目总数"] > _OFFLOAD_THRESHOLD:
+                    payload = (await asyncio.to_thread(orjson.dumps, result)).decode()
+                else:
+                    payload = orjson.dumps(result).decode()
+
                 # 发送最终结果
                 yield {
                     "is_task_complete": True,
                     "content": {
                         "response": {
-                            "result": json.dumps(result, ensure_ascii=False)
+                            "result": payload
                         }
                     }
                 }
@@ -12,6 +12,16 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# 技能和能力描述与 host/port 无关，作为模块级常量只做一次校验
+_CAPABILITIES = AgentCapabilities(streaming=True)
+_SKILL = AgentSkill(
+    id="process_taxi_reimbursement",
+    name="处理打车费报销",
+    description="根据公司规定审核和处理员工的打车费报销申请。",
+    tags=["打车费", "报销", "出租车"],
+    examples=["我需要报销昨晚加班打车回家的费用", "昨天晚上10点在中关村资本大厦打车回家，花了50元"],
+)
+
 
 @click.command()
 @click.option("--host", default="localhost")
@@ -20,15 +30,7 @@ def main(host, port):
     try:
         if not os.getenv("GOOGLE_API_KEY"):
                 raise MissingAPIKeyError("GOOGLE_API_KEY environment variable not set.")
-        
-        capabilities = AgentCapabilities(streaming=True)
-        skill = AgentSkill(
-            id="process_taxi_reimbursement",
-            name="处理打车费报销",
-            description="根据公司规定审核和处理员工的打车费报销申请。",
-            tags=["打车费", "报销", "出租车"],
-            examples=["我需要报销昨晚加班打车回家的费用", "昨天晚上10点在中关村资本大厦打车回家，花了50元"],
-        )
+
         agent_card = AgentCard(
             name="打车费报销代理",
             description="这个代理负责处理员工的打车费报销请求，审核是否符合公司规定（仅报销晚上9点到次日凌晨5点期间、从中关村资本大厦附近出发的打车费）。",
@@ -36,8 +38,8 @@ def main(host, port):
             version="1.0.0",
             defaultInputModes=TaxiReimbursementAgent.SUPPORTED_CONTENT_TYPES,
             defaultOutputModes=TaxiReimbursementAgent.SUPPORTED_CONTENT_TYPES,
-            capabilities=capabilities,
-            skills=[skill],
+            capabilities=_CAPABILITIES,
+            skills=[_SKILL],
         )
         server = A2AServer(
             agent_card=agent_card,
@@ -1,25 +1,81 @@
-import json
-import random
-from typing import Any, AsyncIterable, Dict, Optional
-from datetime import datetime, time
-from google.adk.agents.llm_agent import LlmAgent
-from google.adk.tools.tool_context import ToolContext
-from google.adk.artifacts import InMemoryArtifactService
-from google.adk.memory.in_memory_memory_service import InMemoryMemoryService
-from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
-from google.genai import types
-
-# Local cache of created request_ids for demo purposes.
-request_ids = set()
-
-# 合法的上车地点列表
-VALID_PICKUP_LOCATIONS = [
-    "中关村资本大厦", "中关村资本大厦北门", "海淀区学院南路", "学院南路", "资本大厦"
-]
-
-# 不合法的上车地点关键词
-INVALID_LOCATION_KEYWORDS = ["中关村", "望京", "国贸"]
+import functools
+import itertools
+import re
+from typing import TYPE_CHECKING, Any, AsyncIterable, Dict, Optional
+import orjson
+
+# google.adk / google.genai 的依赖图很大，推迟到真正构建代理时再导入，
+# 只使用 is_valid_pickup_location / is_valid_pickup_time 等纯Python工具
+# 的调用方（例如测试）不用承担这部分导入开销。
+# 注意：工具函数的注解必须保持为真实类型对象，ADK 构建工具声明时直接
+# 比较 param.annotation；tool_context 参数按名称剥离和注入，
+# 运行时用 Any 兜底即可
+if TYPE_CHECKING:
+    from google.adk.agents.llm_agent import LlmAgent
+    from google.adk.tools.tool_context import ToolContext
+else:
+    ToolContext = Any
+
+# Monotonic request_id source for demo purposes: IDs are unique by
+# construction and an ID is valid iff its number is <= the last one issued.
+_REQUEST_COUNTER = itertools.count(1)
+_MAX_ID = [0]
+
+# 合法的上车地点列表（不可变，按长度降序：更长、更具体的模式优先匹配）
+VALID_PICKUP_LOCATIONS = tuple(sorted(
+    ["中关村资本大厦", "中关村资本大厦北门", "海淀区学院南路", "学院南路", "资本大厦"],
+    key=len, reverse=True,
+))
+
+# 不合法的上车地点关键词（同上，不可变且按长度降序）
+INVALID_LOCATION_KEYWORDS = tuple(sorted(["中关村", "望京", "国贸"], key=len, reverse=True))
+
+# 预编译的合法地点正则：命中任一模式即判定合法
+_VALID_RE = re.compile("|".join(map(re.escape, VALID_PICKUP_LOCATIONS)))
+
+# 预编译的不合法关键词正则："中关村"用负向先行断言豁免"中关村资本大厦"，
+# 单次C层扫描即可完成关键词检查
+_INVALID_RE = re.compile(
+    "|".join(
+        "中关村(?!资本大厦)" if keyword == "中关村" else re.escape(keyword)
+        for keyword in INVALID_LOCATION_KEYWORDS
+    )
+)
+
+# 预编译的时间格式正则，统一匹配 "HH:MM"、"HH点MM分"、"HH时MM分"、"HH点"、"HH时" 等常见写法
+_TIME_RE = re.compile(r"^(\d{1,2})(?::|点|时)(?:(\d{1,2})(?:分)?)?$")
+
+# 表单的JSON-Schema属性描述是固定的，作为模块级常量只构建一次，
+# return_form 每次调用只拼接变化的部分（form_data / required / instructions）
+_FORM_PROPERTIES = {
+    'pickup_location': {
+        'type': 'string',
+        'description': '上车地点',
+        'title': '上车地点',
+    },
+    'pickup_time': {
+        'type': 'string',
+        'description': '上车时间（24小时制，如 21:30）',
+        'title': '上车时间',
+    },
+    'date': {
+        'type': 'string',
+        'format': 'date',
+        'description': '乘车日期',
+        'title': '日期',
+    },
+    'amount': {
+        'type': 'string',
+        'format': 'number',
+        'description': '打车费金额',
+        'title': '金额',
+    },
+    'request_id': {
+        'type': 'string',
+        'description': '请求ID',
+        'title': '请求ID',
+    },
+}
 
 def is_valid_pickup_location(location: str) -> bool:
     """
@@ -30,16 +86,14 @@ def is_valid_pickup_location(location: str) -> bool:
     - 不能是中关村、望京、国贸等其他地区
     """
     # 首先检查是否明确包含合法地点
-    for valid_location in VALID_PICKUP_LOCATIONS:
-        if valid_location in location:
-            return True
-    
+    if _VALID_RE.search(location) is not None:
+        return True
+
     # 然后检查是否包含不合法地点关键词
-    # 注意：这里我们需要排除"中关村资本大厦"这样的特殊情况
-    for keyword in INVALID_LOCATION_KEYWORDS:
-        if keyword in location and "中关村资本大厦" not in location:
-            return False
-    
+    # （"中关村资本大厦"这样的特殊情况由负向先行断言豁免）
+    if _INVALID_RE.search(location) is not None:
+        return False
+
     # 如果既不明确合法也不明确不合法，则默认为不合法
     return False
 
@@ -50,34 +104,20 @@ def is_valid_pickup_time(pickup_time: str) -> tuple[bool, str]:
     规则：
     - 上车时间必须在晚上9点到次日凌晨5点之间
     """
-    try:
-        # 尝试解析时间字符串
-        parsed_time = None
-        
-        # 尝试多种常见格式
-        formats = ["%H:%M", "%H点%M分", "%H时%M分", "%H点", "%H时"]
-        
-        for fmt in formats:
-            try:
-                parsed_time = datetime.strptime(pickup_time, fmt).time()
-                break
-            except ValueError:
-                continue
-        
-        if parsed_time is None:
-            return False, "无法识别的时间格式，请使用 HH:MM 格式"
-        
-        # 检查时间是否在晚上9点到次日凌晨5点之间
-        night_start = time(21, 0)  # 晚上9点
-        morning_end = time(5, 0)   # 凌晨5点
-        
-        if parsed_time >= night_start or parsed_time <= morning_end:
-            return True, ""
-        else:
-            return False, f"上车时间 {pickup_time} 不在允许的时间范围内（晚上9点到次日凌晨5点）"
-    
-    except Exception as e:
-        return False, f"时间格式错误: {str(e)}，请使用 HH:MM 格式"
+    # 用单个预编译正则解析时间字符串
+    match = _TIME_RE.match(pickup_time.strip())
+    if match is None:
+        return False, "无法识别的时间格式，请使用 HH:MM 格式"
+
+    hour = int(match.group(1))
+    minute = int(match.group(2) or 0)
+    if hour > 23 or minute > 59:
+        return False, "无法识别的时间格式，请使用 HH:MM 格式"
+
+    # 检查时间是否在晚上9点到次日凌晨5点之间
+    if hour >= 21 or hour < 5 or (hour == 5 and minute == 0):
+        return True, ""
+    return False, f"上车时间 {pickup_time} 不在允许的时间范围内（晚上9点到次日凌晨5点）"
 
 def create_taxi_request_form(
     pickup_location: Optional[str] = None, 
@@ -97,8 +137,9 @@ def create_taxi_request_form(
     Returns:
         dict[str, Any]: 包含表单数据的字典。
     """
-    request_id = "request_id_" + str(random.randint(1000000, 9999999))
-    request_ids.add(request_id)
+    number = next(_REQUEST_COUNTER)
+    _MAX_ID[0] = number
+    request_id = f"request_id_{number:07d}"
     return {
         "request_id": request_id,
         "pickup_location": "<上车地点>" if not pickup_location else pickup_location,
@@ -124,7 +165,7 @@ def return_form(
         dict[str, Any]: 表单响应的JSON字典。
     """  
     if isinstance(form_request, str):
-        form_request = json.loads(form_request)
+        form_request = orjson.loads(form_request)
 
     tool_context.actions.skip_summarization = True
     tool_context.actions.escalate = True
@@ -132,70 +173,55 @@ def return_form(
         'type': 'form',
         'form': {
             'type': 'object',
-            'properties': {
-                'pickup_location': {
-                    'type': 'string',
-                    'description': '上车地点',
-                    'title': '上车地点',
-                },
-                'pickup_time': {
-                    'type': 'string',
-                    'description': '上车时间（24小时制，如 21:30）',
-                    'title': '上车时间',
-                },
-                'date': {
-                    'type': 'string',
-                    'format': 'date',
-                    'description': '乘车日期',
-                    'title': '日期',
-                },
-                'amount': {
-                    'type': 'string',
-                    'format': 'number',
-                    'description': '打车费金额',
-                    'title': '金额',
-                },
-                'request_id': {
-                    'type': 'string',
-                    'description': '请求ID',
-                    'title': '请求ID',
-                },
-            },
+            'properties': _FORM_PROPERTIES,
             'required': list(form_request.keys()),
         },
         'form_data': form_request,
         'instructions': instructions,
     }
-    return json.dumps(form_dict)
+    return orjson.dumps(form_dict).decode()
+
+@functools.lru_cache(maxsize=1024)
+def _validate(pickup_location: str, pickup_time: str) -> tuple[bool, str]:
+    """对(上车地点, 上车时间)组合做纯校验，返回 (是否通过, 拒绝原因)。
+
+    结果只依赖这两个参数，常见的地点/时间组合（固定住址、固定加班
+    下班时间）可以直接命中缓存，跳过正则解析和地点扫描。
+    """
+    # 各项检查按开销从低到高排列：上车时间（定长正则）→ 上车地点（全文扫描），
+    # 让大多数被拒绝的请求尽早短路
+
+    # 检查上车时间是否符合规定
+    valid_time, time_error = is_valid_pickup_time(pickup_time)
+    if not valid_time:
+        return False, time_error
+
+    # 检查上车地点是否符合规定
+    if not is_valid_pickup_location(pickup_location):
+        return False, f"上车地点'{pickup_location}'不符合公司规定，必须是中关村资本大厦附近"
+
+    return True, ""
 
 def reimburse_taxi(request_id: str, pickup_location: str, pickup_time: str) -> dict[str, Any]:
     """
     根据公司政策审核并报销打车费用。
-    
+
     规则：
     - 上车时间必须在晚上9点到次日凌晨5点
     - 上车地点必须是中关村资本大厦附近，不能是中关村、望京、国贸等其他地点
     """
-    if request_id not in request_ids:
+    # 请求ID检查最便宜且逐请求不同，放在缓存的校验之前
+    try:
+        number = int(request_id.rsplit("_", 1)[-1])
+    except ValueError:
+        number = 0
+    if not 0 < number <= _MAX_ID[0]:
         return {"request_id": request_id, "status": "拒绝", "reason": "无效的请求ID"}
-    
-    # 检查上车地点是否符合规定
-    if not is_valid_pickup_location(pickup_location):
-        return {
-            "request_id": request_id, 
-            "status": "拒绝", 
-            "reason": f"上车地点'{pickup_location}'不符合公司规定，必须是中关村资本大厦附近"
-        }
-    
-    # 检查上车时间是否符合规定
-    valid_time, time_error = is_valid_pickup_time(pickup_time)
-    if not valid_time:
-        return {
-            "request_id": request_id, 
-            "status": "拒绝", 
-            "reason": time_error
-        }
-    
+
+    is_valid, reason = _validate(pickup_location, pickup_time)
+    if not is_valid:
+        return {"request_id": request_id, "status": "拒绝", "reason": reason}
+
     # 符合所有规定，批准报销
     return {"request_id": request_id, "status": "批准"}
 
@@ -206,6 +232,11 @@ class TaxiReimbursementAgent:
     SUPPORTED_CONTENT_TYPES = ["text", "text/plain"]
 
     def __init__(self):
+        from google.adk.artifacts import InMemoryArtifactService
+        from google.adk.memory.in_memory_memory_service import InMemoryMemoryService
+        from google.adk.runners import Runner
+        from google.adk.sessions import InMemorySessionService
+
         self._agent = self._build_agent()
         self._user_id = "remote_agent"
         self._runner = Runner(
@@ -217,6 +248,8 @@ class TaxiReimbursementAgent:
         )
 
     def invoke(self, query, session_id) -> str:
+        from google.genai import types
+
         session = self._runner.session_service.get_session(
             app_name=self._agent.name, user_id=self._user_id, session_id=session_id
         )
@@ -238,6 +271,8 @@ class TaxiReimbursementAgent:
         return "\n".join([p.text for p in events[-1].content.parts if p.text])
 
     async def stream(self, query, session_id) -> AsyncIterable[Dict[str, Any]]:
+        from google.genai import types
+
         session = self._runner.session_service.get_session(
             app_name=self._agent.name, user_id=self._user_id, session_id=session_id
         )
@@ -277,8 +312,10 @@ class TaxiReimbursementAgent:
                     "updates": "正在处理打车费报销请求...",
                 }
 
-    def _build_agent(self) -> LlmAgent:
+    def _build_agent(self) -> "LlmAgent":
         """构建打车费报销代理的LLM代理。"""
+        from google.adk.agents.llm_agent import LlmAgent
+
         return LlmAgent(
             model="gemini-2.0-flash-001",
             name="taxi_reimbursement_agent",
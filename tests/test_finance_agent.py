@@ -0,0 +1,79 @@
+"""Tests for the finance reimbursement compliance agent."""
+
+import pytest
+from agents.finace_server.agent import FinanceAgent
+
+
+@pytest.fixture
+def finance_agent():
+  return FinanceAgent()
+
+
+def _expense(category, amount, date="2026-01-01", has_invoice=True):
+  return {"类别": category, "金额": amount, "日期": date, "是否有发票": has_invoice}
+
+
+def test_compliant_expense_passes(finance_agent):
+  result = finance_agent._check_compliance([_expense("交通费", 250)])
+  assert result["合规项目数"] == 1
+  assert result["不合规项目数"] == 0
+  assert result["合规报销总金额"] == 250.0
+  assert result["合规报销"][0]["合规"] is True
+
+
+def test_over_limit_expense_is_rejected(finance_agent):
+  result = finance_agent._check_compliance([_expense("交通费", 350)])
+  assert result["合规项目数"] == 0
+  rejected = result["不合规报销"][0]
+  assert rejected["合规"] is False
+  assert "超出交通费最高限额300.0元" in rejected["原因"]
+
+
+def test_missing_invoice_is_rejected(finance_agent):
+  result = finance_agent._check_compliance(
+      [_expense("住宿费", 400, has_invoice=False)]
+  )
+  rejected = result["不合规报销"][0]
+  assert "住宿费需要提供发票" in rejected["原因"]
+
+
+def test_unknown_category_falls_back_to_other(finance_agent):
+  result = finance_agent._check_compliance([_expense("神秘类", 120)])
+  rejected = result["不合规报销"][0]
+  assert "超出其他最高限额100.0元" in rejected["原因"]
+  # The original expense fields are echoed back untouched.
+  assert rejected["类别"] == "神秘类"
+
+
+def test_meal_daily_limit_rejects_fourth_meal(finance_agent):
+  meals = [_expense("餐饮费", 50, date="2026-01-02") for _ in range(4)]
+  result = finance_agent._check_compliance(meals)
+  assert result["合规项目数"] == 3
+  assert result["不合规项目数"] == 1
+  rejected = result["不合规报销"][0]
+  assert "超出餐饮费每日3次限制" in rejected["原因"]
+
+
+def test_meal_daily_limit_is_tracked_per_date(finance_agent):
+  meals = [
+      _expense("餐饮费", 50, date="2026-01-02") for _ in range(3)
+  ] + [_expense("餐饮费", 50, date="2026-01-03") for _ in range(3)]
+  result = finance_agent._check_compliance(meals)
+  assert result["合规项目数"] == 6
+  assert result["不合规项目数"] == 0
+
+
+def test_missing_date_defaults_to_today(finance_agent):
+  expenses = [{"类别": "餐饮费", "金额": 50, "是否有发票": True} for _ in range(4)]
+  result = finance_agent._check_compliance(expenses)
+  # All four land on today's date, so the fourth still trips the daily limit.
+  assert result["不合规项目数"] == 1
+
+
+def test_summary_counters(finance_agent):
+  expenses = [_expense("交通费", 250), _expense("办公用品", 300)]
+  result = finance_agent._check_compliance(expenses)
+  assert result["报销项目总数"] == 2
+  assert result["合规项目数"] == 1
+  assert result["不合规项目数"] == 1
+  assert result["合规报销总金额"] == 250.0
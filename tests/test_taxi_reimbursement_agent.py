@@ -0,0 +1,114 @@
+"""Tests for the taxi reimbursement agent's validation helpers."""
+
+import pytest
+from agents.taxi_reimbursement_agent.agent import (
+    _validate,
+    create_taxi_request_form,
+    is_valid_pickup_location,
+    is_valid_pickup_time,
+    reimburse_taxi,
+)
+
+
+@pytest.fixture(autouse=True)
+def clear_validation_cache():
+  """Keeps the memoized validator from leaking state between tests."""
+  _validate.cache_clear()
+
+
+class TestIsValidPickupTime:
+  """Covers the 21:00-05:00 reimbursement window and format parsing."""
+
+  @pytest.mark.parametrize(
+      "pickup_time",
+      ["21:00", "21:30", "23:59", "0:00", "00:30", "4:59", "05:00"],
+  )
+  def test_times_inside_window_are_valid(self, pickup_time):
+    valid, error = is_valid_pickup_time(pickup_time)
+    assert valid
+    assert error == ""
+
+  @pytest.mark.parametrize("pickup_time", ["20:59", "05:01", "9:00", "12:00"])
+  def test_times_outside_window_are_rejected(self, pickup_time):
+    valid, error = is_valid_pickup_time(pickup_time)
+    assert not valid
+    assert "不在允许的时间范围内" in error
+
+  @pytest.mark.parametrize(
+      "pickup_time", ["21点30分", "21时30分", "21点", "21时", "5时"]
+  )
+  def test_chinese_formats_are_accepted(self, pickup_time):
+    assert is_valid_pickup_time(pickup_time)[0]
+
+  @pytest.mark.parametrize("pickup_time", ["21:", "21点30", " 21:30 "])
+  def test_lenient_formats_are_accepted(self, pickup_time):
+    # The regex parser is intentionally more lenient than the old strptime
+    # loop: a dangling separator means :00, 分 is optional and surrounding
+    # whitespace is stripped.
+    assert is_valid_pickup_time(pickup_time)[0]
+
+  @pytest.mark.parametrize("pickup_time", ["", "abc", "25:00", "21:75", "晚上九点"])
+  def test_unparseable_times_are_rejected(self, pickup_time):
+    valid, error = is_valid_pickup_time(pickup_time)
+    assert not valid
+    assert "无法识别的时间格式" in error
+
+
+class TestIsValidPickupLocation:
+  """Covers the valid-location list, keyword rejection and the exemption."""
+
+  @pytest.mark.parametrize(
+      "location",
+      [
+          "中关村资本大厦",
+          "中关村资本大厦北门",
+          "从中关村资本大厦出发",
+          "海淀区学院南路10号",
+          "学院南路",
+          "资本大厦南侧",
+      ],
+  )
+  def test_valid_locations(self, location):
+    assert is_valid_pickup_location(location)
+
+  @pytest.mark.parametrize("location", ["中关村", "中关村大街1号", "望京SOHO", "国贸CBD"])
+  def test_invalid_keyword_locations(self, location):
+    assert not is_valid_pickup_location(location)
+
+  def test_capital_tower_exempts_zhongguancun_keyword(self):
+    # "中关村资本大厦" contains the forbidden keyword "中关村" but is the
+    # company building and must stay valid.
+    assert is_valid_pickup_location("中关村资本大厦")
+    assert is_valid_pickup_location("中关村资本大厦旁的望京")
+
+  @pytest.mark.parametrize("location", ["", "天安门", "上地十街"])
+  def test_unknown_locations_are_rejected_by_default(self, location):
+    assert not is_valid_pickup_location(location)
+
+
+class TestReimburseTaxi:
+  """Covers the end-to-end approval flow built on the validators."""
+
+  def test_approves_compliant_request(self):
+    form = create_taxi_request_form()
+    result = reimburse_taxi(form["request_id"], "中关村资本大厦", "22:00")
+    assert result == {"request_id": form["request_id"], "status": "批准"}
+
+  def test_rejects_unknown_request_id(self):
+    create_taxi_request_form()
+    for request_id in ["request_id_9999999", "bogus", ""]:
+      result = reimburse_taxi(request_id, "中关村资本大厦", "22:00")
+      assert result["status"] == "拒绝"
+      assert result["reason"] == "无效的请求ID"
+
+  def test_rejects_bad_time_before_scanning_location(self):
+    form = create_taxi_request_form()
+    result = reimburse_taxi(form["request_id"], "望京", "12:00")
+    assert result["status"] == "拒绝"
+    assert "不在允许的时间范围内" in result["reason"]
+
+  def test_rejects_bad_location(self):
+    form = create_taxi_request_form()
+    result = reimburse_taxi(form["request_id"], "望京", "22:00")
+    assert result["status"] == "拒绝"
+    assert "上车地点" in result["reason"]